@@ -1,52 +1,142 @@
+import asyncio
 import time
 import secrets
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 
 from fastapi import FastAPI, Body, Request, Response, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 
-from server.game.db import get_conn, init_db
+from server.game.db import get_conn, write_conn, init_db
 from server.game.auth import hash_password, verify_password
 
 app = FastAPI()
 WEB_DIR = Path(__file__).resolve().parent.parent / "web"
 
 SESSION_COOKIE = "station_session"
+SESSION_TTL = 30 * 24 * 3600         # seconds a login stays valid
+SESSION_SWEEP_INTERVAL = 10 * 60     # seconds between expired-session sweeps
+
+# token -> (user_id, created_at), so authenticated requests don't hit SQLite every time
+SESSION_CACHE_SIZE = 4096
+_session_cache: OrderedDict[str, tuple[int, float]] = OrderedDict()
+_session_lock = threading.Lock()
+# bumped on every eviction; a DB read only fills the cache if nothing was evicted meanwhile
+_session_gen = 0
+
+
+_sweeper_task: asyncio.Task | None = None
 
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
+    global _sweeper_task
     init_db()
+    _sweeper_task = asyncio.create_task(sweep_sessions_loop())
     print("🚀 Server starting up")
 
 
 @app.on_event("shutdown")
-def on_shutdown():
+async def on_shutdown():
+    if _sweeper_task:
+        _sweeper_task.cancel()
     print("🛑 Server shutting down cleanly")
 
 
+def purge_expired_sessions() -> int:
+    global _session_gen
+    cutoff = time.time() - SESSION_TTL
+    with write_conn() as conn:
+        deleted = conn.execute("DELETE FROM sessions WHERE created_at < ?", (cutoff,)).rowcount
+    if deleted:
+        # cheaper than tracking which cached tokens just expired
+        with _session_lock:
+            _session_cache.clear()
+            _session_gen += 1
+    return deleted
+
+
+async def sweep_sessions_loop():
+    while True:
+        try:
+            await asyncio.to_thread(purge_expired_sessions)
+        except Exception as e:
+            # e.g. "database is locked"; try again next interval
+            print(f"⚠️ Session sweep failed: {e!r}")
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+
+
+def _cache_put(token: str, user_id: int, created_at: float) -> None:
+    # caller holds _session_lock
+    _session_cache[token] = (user_id, created_at)
+    _session_cache.move_to_end(token)
+    if len(_session_cache) > SESSION_CACHE_SIZE:
+        _session_cache.popitem(last=False)
+
+
+def cache_session(token: str, user_id: int, created_at: float) -> None:
+    with _session_lock:
+        _cache_put(token, user_id, created_at)
+
+
+def forget_session(token: str) -> None:
+    global _session_gen
+    with _session_lock:
+        _session_cache.pop(token, None)
+        _session_gen += 1
+
+
 def get_user_id_from_request(request: Request) -> int | None:
     token = request.cookies.get(SESSION_COOKIE)
     if not token:
         return None
-    with get_conn() as conn:
-        row = conn.execute(
-            "SELECT user_id FROM sessions WHERE token=?",
-            (token,),
-        ).fetchone()
-    return int(row["user_id"]) if row else None
+
+    # expired sessions are rejected here; the sweeper only reclaims their rows
+    cutoff = time.time() - SESSION_TTL
+
+    with _session_lock:
+        entry = _session_cache.get(token)
+        if entry is not None:
+            user_id, created_at = entry
+            if created_at < cutoff:
+                del _session_cache[token]
+                return None
+            _session_cache.move_to_end(token)
+            return user_id
+        gen = _session_gen
+
+    row = get_conn().execute(
+        "SELECT user_id, created_at FROM sessions WHERE token=? AND created_at >= ?",
+        (token, cutoff),
+    ).fetchone()
+    if not row:
+        return None
+
+    user_id, created_at = row[0], row[1]  # INTEGER/REAL columns, already typed
+    with _session_lock:
+        # a logout/sweep may have deleted this row after our SELECT; don't resurrect it
+        if gen == _session_gen:
+            _cache_put(token, user_id, created_at)
+    return user_id
 
 
 # -------- Pages --------
 
+@lru_cache(maxsize=None)
+def load_page(name: str) -> str:
+    return (WEB_DIR / name).read_text(encoding="utf-8")
+
+
 @app.get("/login", response_class=HTMLResponse)
 def login_page():
-    return (WEB_DIR / "login.html").read_text(encoding="utf-8")
+    return load_page("login.html")
 
 
 @app.get("/register", response_class=HTMLResponse)
 def register_page():
-    return (WEB_DIR / "register.html").read_text(encoding="utf-8")
+    return load_page("register.html")
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -54,7 +144,7 @@ def home(request: Request):
     user_id = get_user_id_from_request(request)
     if not user_id:
         return RedirectResponse("/login")
-    return (WEB_DIR / "index.html").read_text(encoding="utf-8")
+    return load_page("index.html")
 
 
 # -------- Auth API --------
@@ -70,7 +160,7 @@ def api_register(payload: dict = Body(...)):
     now = time.time()
 
     try:
-        with get_conn() as conn:
+        with write_conn() as conn:
             cur = conn.execute(
                 "INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
                 (username, pw_hash, now),
@@ -89,12 +179,12 @@ def api_login(response: Response, payload: dict = Body(...)):
     if not username or not password:
         raise HTTPException(status_code=400, detail="username_and_password_required")
 
-    with get_conn() as conn:
-        row = conn.execute(
-            "SELECT id, password_hash FROM users WHERE username=?",
-            (username,),
-        ).fetchone()
+    row = get_conn().execute(
+        "SELECT id, password_hash FROM users WHERE username=?",
+        (username,),
+    ).fetchone()
 
+    # verify outside the write lock so slow hashing doesn't serialize logins
     if not row or not verify_password(password, row["password_hash"]):
         raise HTTPException(status_code=401, detail="invalid_credentials")
 
@@ -102,15 +192,17 @@ def api_login(response: Response, payload: dict = Body(...)):
     token = secrets.token_urlsafe(32)
     now = time.time()
 
-    with get_conn() as conn:
+    with write_conn() as conn:
         conn.execute(
             "INSERT INTO sessions (token, user_id, created_at) VALUES (?, ?, ?)",
             (token, user_id, now),
         )
+    cache_session(token, user_id, now)
 
     response.set_cookie(
         key=SESSION_COOKIE,
         value=token,
+        max_age=SESSION_TTL,
         httponly=True,
         samesite="lax",
     )
@@ -121,8 +213,9 @@ def api_login(response: Response, payload: dict = Body(...)):
 def api_logout(request: Request, response: Response):
     token = request.cookies.get(SESSION_COOKIE)
     if token:
-        with get_conn() as conn:
+        with write_conn() as conn:
             conn.execute("DELETE FROM sessions WHERE token=?", (token,))
+        forget_session(token)
     response.delete_cookie(SESSION_COOKIE)
     return {"ok": True}
 
@@ -133,7 +226,6 @@ def api_me(request: Request):
     if not user_id:
         return {"ok": True, "user_id": None}
 
-    with get_conn() as conn:
-        row = conn.execute("SELECT username FROM users WHERE id=?", (user_id,)).fetchone()
+    row = get_conn().execute("SELECT username FROM users WHERE id=?", (user_id,)).fetchone()
 
     return {"ok": True, "user_id": user_id, "username": row["username"] if row else None}
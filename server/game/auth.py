@@ -1,15 +1,18 @@
 import hashlib
+import os
 import secrets
 
 # PBKDF2 parameters
-_ITERATIONS = 200_000
+# Cost for new hashes; existing hashes keep the count stored in them.
+PASSWORD_ITERATIONS = int(os.environ.get("STATION_PASSWORD_ITERATIONS", "200000"))
 _SALT_BYTES = 16
 
 def hash_password(password: str) -> str:
     salt = secrets.token_bytes(_SALT_BYTES)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, _ITERATIONS)
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PASSWORD_ITERATIONS)
     # store as: algo$iters$salt_hex$hash_hex
-    return f"pbkdf2_sha256${_ITERATIONS}${salt.hex()}${dk.hex()}"
+    # (verify_password reads iters back from the hash, so changing the cost is safe)
+    return f"pbkdf2_sha256${PASSWORD_ITERATIONS}${salt.hex()}${dk.hex()}"
 
 def verify_password(password: str, stored: str) -> bool:
     try:
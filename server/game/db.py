@@ -1,18 +1,47 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 DB_PATH = Path(__file__).resolve().parent.parent / "game.db"
 
+# One long-lived connection per thread (FastAPI runs sync endpoints on a thread pool).
+_local = threading.local()
+# SQLite allows one writer at a time; queue writers here instead of on the file lock.
+_write_lock = threading.Lock()
 
-def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    # Per-connection tuning (journal_mode=WAL is persisted in the file by init_db)
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -20000;")
+    conn.execute("PRAGMA mmap_size = 268435456;")
     return conn
 
 
+def get_conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
+    return conn
+
+
+@contextmanager
+def write_conn() -> Iterator[sqlite3.Connection]:
+    conn = get_conn()
+    with _write_lock, conn:
+        yield conn
+
+
 def init_db() -> None:
-    with get_conn() as conn:
+    with write_conn() as conn:
         conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute("PRAGMA journal_mode = WAL;")
 
         # --- Auth ---
         conn.execute("""
@@ -30,8 +59,10 @@ def init_db() -> None:
             user_id INTEGER NOT NULL,
             created_at REAL NOT NULL,
             FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
+        ) WITHOUT ROWID
         """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_user ON sessions(user_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_created ON sessions(created_at)")
 
         # --- Prototype legacy (v0) ---
         conn.execute("""